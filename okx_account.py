@@ -1,6 +1,4 @@
 import requests
-import time
-from datetime import datetime, timezone
 import base64
 import hmac
 import hashlib
@@ -9,6 +7,8 @@ from urllib.parse import urlencode
 import asyncio
 import websockets
 import logging
+from okx_clock import OKXClock
+from okx_models import parse, loads, loads_columns, check, validate_decimal, Ticker, Position, Balance, Order, OrderAck, Fill
 
 class OKXAccount:
     BASE_URL = "https://www.okx.com"
@@ -20,11 +20,23 @@ class OKXAccount:
     SIM_WS_PRIVATE = "wss://wspap.okx.com:8443/ws/v5/private"
     SIM_WS_BUSINESS = "wss://wspap.okx.com:8443/ws/v5/business"
 
-    def __init__(self, api_key, api_secret, passphrase, simulated=False):
+    def __init__(self, api_key, api_secret, passphrase, simulated=False, clock=None, sync_clock=False, typed=False, decimal=()):
         self.api_key = api_key
         self.api_secret = api_secret
         self.passphrase = passphrase
         self.simulated = simulated
+        # 服务器时间校正：所有签名时间戳都取自 self.clock（未同步成功前会短超时阻塞采样，失败则退避重试）；
+        # sync_clock=True 或首次使用 latency_budget_ms 时启动后台定期同步，避免长时间运行后漂移
+        self.clock = clock or OKXClock(self.BASE_URL)
+        if sync_clock:
+            self.clock.start()
+        # typed=True 时 REST 方法返回 okx_models 中的惰性解码记录列表，并在 code != "0" 时抛出 OKXAPIError；
+        # decimal 指定解码为 Decimal 的数值字段（其余为 float）：True 表示全部；字段名序列对所有模型共享，
+        # 某模型中不存在的字段名会被忽略（但必须是某个模型的数值字段，拼写错误直接抛出 ValueError）；
+        # 也可按模型设置，如 {Ticker: ("last",), BalanceDetail: True}
+        validate_decimal(decimal)
+        self.typed = typed
+        self.decimal = decimal
         # logger: DEBUG 时会记录 headers/登录参数（会对敏感字段进行遮掩）
         self.logger = logging.getLogger(__name__)
         # 实例级别的 WS endpoints（根据 simulated 切换）
@@ -48,9 +60,9 @@ class OKXAccount:
 
         示例格式: 2025-09-22T06:37:18.359Z
         """
-        return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+        return self.clock.now_iso()
 
-    def _headers(self, method, request_path, body=""):
+    def _headers(self, method, request_path, body="", latency_budget_ms=None):
         # ts = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
         # ts = str(time.time())
         ts = self._now_iso()
@@ -65,6 +77,11 @@ class OKXAccount:
         }
         if self.simulated:
             headers["x-simulated-trading"] = "1"
+        # expTime: 超过该时间（Unix 毫秒）交易所将不再处理该请求，避免延迟到达的订单以过期价格成交；
+        # 依赖准确的服务器时间，因此首次使用时启动后台定期同步
+        if latency_budget_ms is not None:
+            headers["expTime"] = self.clock.exp_time(latency_budget_ms)
+            self.clock.start()
         # 仅在 DEBUG 级别记录（并遮掩敏感字段）
         if self.logger.isEnabledFor(logging.DEBUG):
             try:
@@ -90,7 +107,7 @@ class OKXAccount:
                 masked[k] = v
         return masked
 
-    def _request(self, method, path, params=None, body=None, private=False):
+    def _request(self, method, path, params=None, body=None, private=False, latency_budget_ms=None, model=None, columns=None, bulk=False):
         url = self.BASE_URL + path
         body_str = json.dumps(body) if body else ""
 
@@ -101,7 +118,7 @@ class OKXAccount:
             qs = urlencode(params, doseq=True)
             request_path_for_sign = path + "?" + qs
 
-        headers = self._headers(method, request_path_for_sign, body_str) if private else {}
+        headers = self._headers(method, request_path_for_sign, body_str, latency_budget_ms) if private else {}
         # DEBUG 时记录请求体（已遮掩敏感字段）
         if self.logger.isEnabledFor(logging.DEBUG) and private:
             try:
@@ -112,7 +129,20 @@ class OKXAccount:
                 pass
 
         resp = requests.request(method, url, headers=headers, params=params, data=body_str)
-        return resp.json()
+        if columns:
+            # 列式解码：columns=True 表示全部字段，或传入字段名列表
+            return loads_columns(resp.text, model, None if columns is True else columns)
+        if not self.typed:
+            return resp.json()
+        if model is None:
+            # 无对应模型的接口仍返回原始 dict，但同样校验错误码
+            data = resp.json()
+            check(data)
+            return data
+        if bulk:
+            # 大批量列表（positions/fills）在解析时直接构造记录以降低峰值内存
+            return loads(resp.text, model, self.decimal, strict=False)
+        return parse(resp.json(), model, self.decimal, strict=False)
 
     # ============ REST API ============
     def get_balance(self, ccy=None):
@@ -123,7 +153,7 @@ class OKXAccount:
         path = "/api/v5/account/balance"
         if ccy:
             path += f"?ccy={ccy}"
-        return self._request("GET", path, private=True)
+        return self._request("GET", path, private=True, model=Balance)
 
     def get_positions(self, instType=None, instId=None, posId=None):
         """
@@ -140,7 +170,7 @@ class OKXAccount:
             params["instId"] = instId
         if posId:
             params["posId"] = posId
-        return self._request("GET", path, params=params, private=True)
+        return self._request("GET", path, params=params, private=True, model=Position, bulk=True)
 
     def get_account_config(self):
         """
@@ -181,13 +211,13 @@ class OKXAccount:
     def get_price(self, instId="BTC-USDT"):
         path = "/api/v5/market/ticker"
         params = {"instId": instId}
-        return self._request("GET", path, params=params, private=False)
+        return self._request("GET", path, params=params, private=False, model=Ticker)
 
     def place_order(
         self, instId, tdMode="cross", side="buy", ordType="market", sz="1",
         px=None, posSide=None, ccy=None, clOrdId=None, tag=None, reduceOnly=None,
         tgtCcy=None, banAmend=None, pxAmendType=None, tradeQuoteCcy=None,
-        stpMode=None, attachAlgoOrds=None
+        stpMode=None, attachAlgoOrds=None, latency_budget_ms=None
     ):
         """
         下单接口（支持完整参数）
@@ -199,6 +229,7 @@ class OKXAccount:
         ordType: market / limit / post_only / fok / ioc / optimal_limit_ioc 等
         sz: 委托数量
         px: 委托价格，仅限价单/IOC等需要
+        latency_budget_ms: 可选，延迟预算（毫秒）；设置后请求带 expTime 头，超时未处理的订单由交易所直接丢弃
         其他参数参考官方文档
         """
         path = "/api/v5/trade/order"
@@ -234,16 +265,16 @@ class OKXAccount:
         if attachAlgoOrds is not None:
             body["attachAlgoOrds"] = attachAlgoOrds
 
-        return self._request("POST", path, body=body, private=True)
+        return self._request("POST", path, body=body, private=True, latency_budget_ms=latency_budget_ms, model=OrderAck)
 
-    def cancel_order(self, instId, ordId=None, clOrdId=None):
+    def cancel_order(self, instId, ordId=None, clOrdId=None, latency_budget_ms=None):
         path = "/api/v5/trade/cancel-order"
         body = {"instId": instId}
         if ordId:
             body["ordId"] = ordId
         if clOrdId:
             body["clOrdId"] = clOrdId
-        return self._request("POST", path, body=body, private=True)
+        return self._request("POST", path, body=body, private=True, latency_budget_ms=latency_budget_ms, model=OrderAck)
 
     def query_order(self, instId, ordId=None, clOrdId=None):
         path = "/api/v5/trade/order"
@@ -252,13 +283,33 @@ class OKXAccount:
             params["ordId"] = ordId
         if clOrdId:
             params["clOrdId"] = clOrdId
-        return self._request("GET", path, params=params, private=True)
+        return self._request("GET", path, params=params, private=True, model=Order)
+
+    def get_fills(self, instType=None, instId=None, ordId=None, limit=None, columns=None):
+        """
+        获取近 3 天成交明细
+        文档: GET /api/v5/trade/fills
+
+        columns: 选填，True 或字段名列表；设置后（typed 与否均可）直接返回列式数组
+                 {字段名: array/list}，适合大批量成交统计，错误码同样抛出 OKXAPIError
+        """
+        path = "/api/v5/trade/fills"
+        params = {}
+        if instType:
+            params["instType"] = instType
+        if instId:
+            params["instId"] = instId
+        if ordId:
+            params["ordId"] = ordId
+        if limit:
+            params["limit"] = str(limit)
+        return self._request("GET", path, params=params, private=True, model=Fill, columns=columns, bulk=True)
 
     # ============ WebSocket ============
     def _login_params(self):
         # WebSocket login requires timestamp as Unix epoch seconds (string),
         # e.g. Date.now()/1000 in JS. Use float seconds to include milliseconds.
-        ts = str(time.time())
+        ts = str(self.clock.now())
         sign = self._sign(ts + "GET" + "/users/self/verify")
         args = {
             "apiKey": self.api_key,
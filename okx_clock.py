@@ -0,0 +1,145 @@
+import requests
+import time
+import threading
+import logging
+import statistics
+from datetime import datetime, timezone
+
+
+class OKXClock:
+    """与交易所服务器时间对齐的时钟
+
+    通过 GET /api/v5/public/time 估算本地与 OKX 服务器的时间偏移（offset）和往返时延（RTT）。
+    每轮同步采样多次，只保留 RTT 最小的一半样本并取 offset 中位数，以剔除网络抖动造成的离群值。
+    可调用 start() 启动后台线程定期刷新。auto_sync=True（默认）时，读取时间前若从未同步成功，
+    会先阻塞做一次短超时（first_timeout）单次采样；失败则记录警告、暂时使用本地时间，
+    并在 retry_interval 秒后重试，直到成功或后台线程接管。
+    """
+
+    TIME_PATH = "/api/v5/public/time"
+
+    def __init__(self, base_url="https://www.okx.com", interval=60.0, samples=5, timeout=5.0, auto_sync=True,
+                 first_timeout=1.0, retry_interval=10.0):
+        self.base_url = base_url
+        self.interval = interval
+        self.samples = samples
+        self.timeout = timeout
+        self.auto_sync = auto_sync
+        self.first_timeout = first_timeout
+        self.retry_interval = retry_interval
+        self.logger = logging.getLogger(__name__)
+        # offset = 服务器时间 - 本地时间（秒）；rtt 为最近一轮的中位往返时延（秒）
+        self.offset = 0.0
+        self.rtt = None
+        self.last_sync = None
+        self._lock = threading.Lock()
+        # 保证多个线程同时读取时间时只有一个执行阻塞采样；_next_retry 为失败后的下次重试时间（monotonic）
+        self._sync_lock = threading.Lock()
+        self._next_retry = 0.0
+        self._stop = None
+        self._thread = None
+
+    # ============ 采样 ============
+    def _sample(self, timeout=None):
+        """单次采样，返回 (offset, rtt)，单位秒"""
+        t0 = time.time()
+        p0 = time.perf_counter()
+        resp = requests.get(self.base_url + self.TIME_PATH, timeout=timeout or self.timeout)
+        p1 = time.perf_counter()
+        data = resp.json()
+        if data.get("code") != "0" or not data.get("data"):
+            raise ValueError(f"Unexpected server time response: {data}")
+        server = int(data["data"][0]["ts"]) / 1000.0
+        rtt = p1 - p0
+        # 假设请求/响应路径对称：服务器时间对应本地的发送与接收时刻中点
+        return server - (t0 + rtt / 2), rtt
+
+    def sync(self):
+        """执行一轮同步，成功返回 True；全部采样失败时保留上一次的 offset"""
+        results = []
+        for _ in range(max(1, self.samples)):
+            try:
+                results.append(self._sample())
+            except Exception as e:
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("Server time sample failed: %s", e)
+        if not results:
+            self.logger.warning("Clock sync failed, keeping offset %.3fs", self.offset)
+            return False
+
+        # 只保留 RTT 最小的一半样本，RTT 越小 offset 估计误差越小
+        results.sort(key=lambda r: r[1])
+        best = results[:max(1, len(results) // 2)]
+        self._update(statistics.median(r[0] for r in best), statistics.median(r[1] for r in best))
+        return True
+
+    def _update(self, offset, rtt):
+        with self._lock:
+            self.offset = offset
+            self.rtt = rtt
+            self.last_sync = time.time()
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Clock synced: offset=%.1fms rtt=%.1fms", offset * 1000, rtt * 1000)
+
+    # ============ 后台刷新 ============
+    def _run(self, stop):
+        # 首次同步已由 ensure_synced 完成时，等待一个周期后再刷新，避免重复请求
+        if self.last_sync is not None:
+            stop.wait(self.interval)
+        while not stop.is_set():
+            self.sync()
+            stop.wait(self.interval)
+
+    def start(self):
+        """启动后台同步线程（daemon），重复调用无副作用"""
+        if self.is_running():
+            return
+        # 每个线程使用独立的 stop 事件：stop() 后旧线程即使仍在同步中，也会在本轮结束后退出
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,), name="okx-clock-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """停止后台同步；timeout 为等待线程退出的秒数，None 表示等待本轮同步结束"""
+        if self._stop:
+            self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            if not self._thread.is_alive():
+                self._thread = None
+
+    def is_running(self):
+        return bool(self._thread and self._thread.is_alive() and not self._stop.is_set())
+
+    def ensure_synced(self):
+        """从未同步成功时阻塞做一次短超时采样；失败后按 retry_interval 退避重试，后台线程运行时交由其重试"""
+        if self.last_sync is not None or self.is_running() or time.monotonic() < self._next_retry:
+            return
+        with self._sync_lock:
+            if self.last_sync is not None or time.monotonic() < self._next_retry:
+                return
+            try:
+                self._update(*self._sample(self.first_timeout))
+            except Exception as e:
+                self._next_retry = time.monotonic() + self.retry_interval
+                self.logger.warning("Server time unavailable (%s), using the local clock; retry in %gs", e, self.retry_interval)
+
+    # ============ 时间读取 ============
+    def now(self):
+        """校正后的 Unix 时间戳（秒，float）"""
+        if self.auto_sync:
+            self.ensure_synced()
+        with self._lock:
+            offset = self.offset
+        return time.time() + offset
+
+    def now_ms(self):
+        return int(self.now() * 1000)
+
+    def now_iso(self):
+        """校正后的 ISO8601 UTC 毫秒时间戳，示例: 2025-09-22T06:37:18.359Z"""
+        return datetime.fromtimestamp(self.now(), timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+    def exp_time(self, latency_budget_ms):
+        """根据延迟预算生成 OKX expTime 请求头的值（Unix 毫秒字符串）"""
+        return str(self.now_ms() + int(latency_budget_ms))
@@ -32,8 +32,8 @@ if not all([API_KEY, API_SECRET, PASSPHRASE]):
     raise RuntimeError("Missing OKX credentials in .env. Please set OKX_API_KEY, OKX_API_SECRET, OKX_PASSPHRASE")
 
 async def main():
-    # 初始化账户 (设置 simulated=True 使用模拟盘)
-    okx = OKXAccount(API_KEY, API_SECRET, PASSPHRASE, simulated=False)
+    # 初始化账户 (设置 simulated=True 使用模拟盘；sync_clock=True 后台定期与服务器对时)
+    okx = OKXAccount(API_KEY, API_SECRET, PASSPHRASE, simulated=False, sync_clock=True)
 
     def pjson(label, obj):
         try:
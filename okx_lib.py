@@ -8,6 +8,7 @@ import hashlib
 import json
 import websocket
 import threading
+from okx_clock import OKXClock
 
 # ============ 配置 ============
 # 尝试从 .env 文件加载（如果安装了 python-dotenv），否则使用环境变量，最后回退到占位字符串
@@ -27,23 +28,31 @@ BASE_URL = os.getenv('OKX_BASE_URL', "https://www.okx.com")
 WS_PUBLIC = os.getenv('OKX_WS_PUBLIC', "wss://ws.okx.com:8443/ws/v5/public")
 WS_PRIVATE = os.getenv('OKX_WS_PRIVATE', "wss://ws.okx.com:8443/ws/v5/private")
 
+# 服务器时间校正：首次签名前阻塞同步一次；CLOCK.start() 启动后台定期同步（使用延迟预算时自动启动）
+CLOCK = OKXClock(BASE_URL)
+
 # ============ 签名工具 ============
 def _sign(message: str, secret_key: str):
     return base64.b64encode(
         hmac.new(secret_key.encode(), message.encode(), hashlib.sha256).digest()
     ).decode()
 
-def _headers(method, request_path, body=""):
-    ts = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+def _headers(method, request_path, body="", latency_budget_ms=None):
+    ts = CLOCK.now_iso()
     prehash = f"{ts}{method}{request_path}{body}"
     sign = _sign(prehash, API_SECRET)
-    return {
+    headers = {
         "OK-ACCESS-KEY": API_KEY,
         "OK-ACCESS-SIGN": sign,
         "OK-ACCESS-TIMESTAMP": ts,
         "OK-ACCESS-PASSPHRASE": PASSPHRASE,
         "Content-Type": "application/json"
     }
+    # expTime: 超过该时间（Unix 毫秒）交易所将丢弃该请求；依赖准确的服务器时间，因此首次使用时启动后台同步
+    if latency_budget_ms is not None:
+        headers["expTime"] = CLOCK.exp_time(latency_budget_ms)
+        CLOCK.start()
+    return headers
 
 # ============ REST 封装 ============
 def get_balance(ccy="USDT"):
@@ -78,7 +87,7 @@ def get_price(instId="SOL-USDC"):
     except Exception as e:
         return {"error": str(e)}
 
-def place_order(instId="SOL-USDC-SWAP", tdMode="cross", side="buy", ordType="market", sz="1", px=None, posSide=None, reduceOnly=False):
+def place_order(instId="SOL-USDC-SWAP", tdMode="cross", side="buy", ordType="market", sz="1", px=None, posSide=None, reduceOnly=False, latency_budget_ms=None):
     """
     Place an order.
 
@@ -91,6 +100,8 @@ def place_order(instId="SOL-USDC-SWAP", tdMode="cross", side="buy", ordType="mar
       px: price for limit orders (optional).
       posSide: optional, "long" or "short" in dual-side position mode.
       reduceOnly: optional bool, set True to mark order as reduce-only.
+      latency_budget_ms: optional, sets the expTime header so the exchange drops the order if it
+        arrives later than this many milliseconds from now.
 
     Note: behaviour depends on your OKX account/market settings (single-side vs dual-side). If your account uses
     dual-side (hedged) mode and you need to explicitly open a short, pass posSide="short" and side="sell".
@@ -118,7 +129,7 @@ def place_order(instId="SOL-USDC-SWAP", tdMode="cross", side="buy", ordType="mar
 
     body_str = json.dumps(body)
     try:
-        resp = requests.post(url, headers=_headers("POST", path, body_str), data=body_str)
+        resp = requests.post(url, headers=_headers("POST", path, body_str, latency_budget_ms), data=body_str)
         return resp.json()
     except Exception as e:
         return {"error": str(e)}
@@ -134,13 +145,13 @@ def get_orders(instId=None, state="live"):
     except Exception as e:
         return {"error": str(e)}
 
-def cancel_order(instId, ordId):
+def cancel_order(instId, ordId, latency_budget_ms=None):
     path = "/api/v5/trade/cancel-order"
     url = BASE_URL + path
     body = {"instId": instId, "ordId": ordId}
     body_str = json.dumps(body)
     try:
-        resp = requests.post(url, headers=_headers("POST", path, body_str), data=body_str)
+        resp = requests.post(url, headers=_headers("POST", path, body_str, latency_budget_ms), data=body_str)
         return resp.json()
     except Exception as e:
         return {"error": str(e)}
@@ -158,7 +169,7 @@ def get_fills(instId=None, limit=20):
 
 # ============ WebSocket 封装 ============
 def login_params():
-    ts = str(time.time())
+    ts = str(CLOCK.now())
     sign = _sign(ts + "GET" + "/users/self/verify", API_SECRET)
     return {
         "op": "login",
@@ -240,8 +251,23 @@ def build_order_payload(instId="SOL-USDC-SWAP", tdMode="cross", side="buy", ordT
         body["reduceOnly"] = True
     return body
 
+def build_ws_order_request(payload, latency_budget_ms, req_id):
+    """
+    Wrap an order payload (see build_order_payload) into a WS "order" request.
+
+    req_id: client request id required by OKX (alphanumeric, up to 32 chars).
+    latency_budget_ms: sets expTime so the exchange drops the order once the budget expires;
+      like the REST calls, this starts background clock sync on first use. None omits expTime.
+    """
+    req = {"id": str(req_id), "op": "order", "args": [payload]}
+    if latency_budget_ms is not None:
+        req["expTime"] = CLOCK.exp_time(latency_budget_ms)
+        CLOCK.start()
+    return req
+
 # ============ 示例 ============
 if __name__ == "__main__":
+    CLOCK.start()
     print("💰 账户余额:", get_balance("USDT"))
     print("📊 当前仓位:", get_positions("SOL-USDC-SWAP"))
     print("📈 当前价格:", get_price("SOL-USDC"))
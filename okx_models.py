@@ -0,0 +1,471 @@
+import json
+from array import array
+from decimal import Decimal
+
+_NO_MASKS = {}
+
+
+class OKXAPIError(Exception):
+    """OKX 返回 code != "0" 时抛出
+
+    code/msg 为顶层错误码与信息；对于下单/撤单等逐条返回结果的接口，
+    第一条失败记录的 sCode/sMsg 会拼接进异常信息，完整数据保存在 data。
+    """
+
+    def __init__(self, code, msg, data=None):
+        self.code = code
+        self.msg = msg
+        self.data = data or []
+        detail = ""
+        for item in self.data:
+            if isinstance(item, Record):
+                item = item.to_dict()
+            if isinstance(item, dict) and item.get("sCode") not in (None, "", "0"):
+                detail = f" [sCode={item.get('sCode')} sMsg={item.get('sMsg')}]"
+                break
+        super().__init__(f"OKX API error {code}: {msg}{detail}")
+
+
+def check(resp):
+    """校验响应并返回 data 列表，错误时抛出 OKXAPIError"""
+    code = resp.get("code")
+    if code != "0":
+        raise OKXAPIError(code, resp.get("msg", ""), resp.get("data"))
+    return resp.get("data") or []
+
+
+# ============ 字段定义 ============
+class _Field:
+    """记录字段描述符：首次访问时才解码原始字符串，解码结果原地写回"""
+
+    __slots__ = ("name", "key", "index")
+
+    def __init__(self, key=None):
+        self.key = key
+        self.name = None
+        self.index = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        if self.key is None:
+            self.key = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        i = self.index
+        bit = 1 << i
+        vals = obj._vals
+        if not obj._done & bit:
+            vals[i] = self.decode(vals[i], obj)
+            obj._done |= bit
+        return vals[i]
+
+    def decode(self, raw, obj):
+        return raw
+
+
+class Str(_Field):
+    __slots__ = ()
+
+
+class Num(_Field):
+    """数值字段；空字符串解码为 None，默认 float，可按字段选择 Decimal"""
+
+    __slots__ = ()
+
+    def decode(self, raw, obj):
+        if raw is None or raw == "":
+            return None
+        if obj._masks.get(type(obj), 0) >> self.index & 1:
+            return Decimal(raw)
+        return float(raw)
+
+
+class Int(_Field):
+    """整数字段（毫秒时间戳等）"""
+
+    __slots__ = ()
+
+    def decode(self, raw, obj):
+        if raw is None or raw == "":
+            return None
+        return int(raw)
+
+
+class Nested(_Field):
+    """嵌套记录列表，如 balance 的 details"""
+
+    __slots__ = ("model",)
+
+    def __init__(self, model, key=None):
+        super().__init__(key)
+        self.model = model
+
+    def decode(self, raw, obj):
+        if not raw:
+            return []
+        # 嵌套记录沿用父记录的 Decimal 设置
+        from_dict = self.model.from_dict
+        masks = obj._masks
+        return [from_dict(d, masks) for d in raw]
+
+
+# ============ 记录基类 ============
+class Record:
+    """紧凑响应记录
+
+    原始字段值按定义顺序保存在一个 list 中（不保留 dict 的键），_done 位图记录哪些字段已解码；
+    _masks 为 {模型: Decimal 位图}，同一次解析的所有记录（含嵌套记录）共享同一个 dict。
+    _required 是 loads() 在解析时识别本模型对象所需的键集合（必须全部存在，避免误匹配嵌套对象）。
+    """
+
+    __slots__ = ("_vals", "_done", "_masks")
+    _fields = ()
+    _keys = ()
+    _required = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = []
+        for klass in reversed(cls.__mro__):
+            for v in vars(klass).values():
+                if isinstance(v, _Field) and v not in fields:
+                    fields.append(v)
+        for i, f in enumerate(fields):
+            f.index = i
+        cls._fields = tuple(fields)
+        cls._keys = tuple(f.key for f in fields)
+
+    def __init__(self, vals, masks=None):
+        self._vals = vals
+        self._done = 0
+        self._masks = masks or _NO_MASKS
+
+    @classmethod
+    def decimal_mask(cls, decimal=()):
+        """把字段名集合转换为 Decimal 位图；decimal=True 表示全部数值字段"""
+        if decimal is True:
+            return sum(1 << f.index for f in cls._fields if isinstance(f, Num))
+        by_name = {f.name: f for f in cls._fields}
+        mask = 0
+        for name in decimal or ():
+            f = by_name.get(name)
+            if not isinstance(f, Num):
+                raise ValueError(f"{cls.__name__} has no numeric field {name!r}")
+            mask |= 1 << f.index
+        return mask
+
+    @classmethod
+    def from_dict(cls, d, masks=None):
+        return cls(list(map(d.get, cls._keys)), masks)
+
+    def to_dict(self):
+        return {f.name: getattr(self, f.name) for f in self._fields}
+
+    def __repr__(self):
+        body = ", ".join(f"{f.name}={getattr(self, f.name)!r}" for f in self._fields[:4])
+        return f"{type(self).__name__}({body}, ...)"
+
+
+# ============ 响应模型 ============
+class Ticker(Record):
+    __slots__ = ()
+    _required = frozenset(("instId", "last", "askPx", "bidPx", "ts"))
+    instType = Str()
+    instId = Str()
+    last = Num()
+    lastSz = Num()
+    askPx = Num()
+    askSz = Num()
+    bidPx = Num()
+    bidSz = Num()
+    open24h = Num()
+    high24h = Num()
+    low24h = Num()
+    vol24h = Num()
+    volCcy24h = Num()
+    ts = Int()
+
+
+class Position(Record):
+    __slots__ = ()
+    _required = frozenset(("instId", "posId", "pos", "avgPx", "mgnMode"))
+    instType = Str()
+    instId = Str()
+    posId = Str()
+    posSide = Str()
+    mgnMode = Str()
+    ccy = Str()
+    pos = Num()
+    availPos = Num()
+    avgPx = Num()
+    markPx = Num()
+    liqPx = Num()
+    lever = Num()
+    upl = Num()
+    uplRatio = Num()
+    realizedPnl = Num()
+    margin = Num()
+    imr = Num()
+    mmr = Num()
+    mgnRatio = Num()
+    notionalUsd = Num()
+    cTime = Int()
+    uTime = Int()
+
+
+class BalanceDetail(Record):
+    __slots__ = ()
+    _required = frozenset(("ccy", "eq", "availBal", "cashBal"))
+    ccy = Str()
+    eq = Num()
+    cashBal = Num()
+    availBal = Num()
+    availEq = Num()
+    frozenBal = Num()
+    ordFrozen = Num()
+    upl = Num()
+    eqUsd = Num()
+    uTime = Int()
+
+
+class Balance(Record):
+    __slots__ = ()
+    _required = frozenset(("totalEq", "adjEq", "details"))
+    totalEq = Num()
+    isoEq = Num()
+    adjEq = Num()
+    imr = Num()
+    mmr = Num()
+    mgnRatio = Num()
+    notionalUsd = Num()
+    uTime = Int()
+    details = Nested(BalanceDetail)
+
+
+class Order(Record):
+    __slots__ = ()
+    _required = frozenset(("ordId", "instId", "state", "accFillSz", "ordType"))
+    instType = Str()
+    instId = Str()
+    ordId = Str()
+    clOrdId = Str()
+    tag = Str()
+    side = Str()
+    posSide = Str()
+    ordType = Str()
+    tdMode = Str()
+    state = Str()
+    feeCcy = Str()
+    px = Num()
+    sz = Num()
+    accFillSz = Num()
+    avgPx = Num()
+    fillPx = Num()
+    fillSz = Num()
+    fee = Num()
+    pnl = Num()
+    lever = Num()
+    cTime = Int()
+    uTime = Int()
+
+
+class OrderAck(Record):
+    """下单/撤单的逐条返回结果"""
+
+    __slots__ = ()
+    _required = frozenset(("ordId", "clOrdId", "sCode", "sMsg"))
+    ordId = Str()
+    clOrdId = Str()
+    tag = Str()
+    sCode = Str()
+    sMsg = Str()
+    ts = Int()
+
+
+class Fill(Record):
+    __slots__ = ()
+    _required = frozenset(("tradeId", "instId", "fillPx", "fillSz", "billId"))
+    instType = Str()
+    instId = Str()
+    tradeId = Str()
+    ordId = Str()
+    clOrdId = Str()
+    billId = Str()
+    side = Str()
+    posSide = Str()
+    execType = Str()
+    feeCcy = Str()
+    fillPx = Num()
+    fillSz = Num()
+    fee = Num()
+    ts = Int()
+    fillTime = Int()
+
+
+# ============ 批量解码 ============
+#
+# 性能说明（50k 条 fills、每条 25 个字段，CPython 3.11，tracemalloc 下取三次中位数）：
+#   方式                          耗时     常驻内存   峰值内存
+#   json.loads（dict 列表）        0.25s    88MB       88MB
+#   json.loads + parse()          0.38s    50MB       100MB
+#   json.loads + parse_columns()  0.44s    29MB       110MB
+#   loads()                       0.44s    50MB       50MB
+#   loads_columns()               0.45s    29MB       60MB
+# 标准库 json 的 C 解码器总会先构造 dict，纯 Python 层无法比 json.loads 更快，解析时间反而增加约 50%-80%；
+# 收益在于内存：常驻内存降低约 40%（列式约 65%），loads 系列峰值内存约减半；另外省去调用方反复 float() 的开销。
+
+
+MODELS = (Ticker, Position, Balance, BalanceDetail, Order, OrderAck, Fill)
+
+
+def validate_decimal(decimal):
+    """校验跨模型共享的 Decimal 设置：字段名必须至少是某个模型的数值字段，拼写错误直接抛出 ValueError"""
+    if decimal is True or not decimal:
+        return
+    if isinstance(decimal, dict):
+        for m, spec in decimal.items():
+            if not (isinstance(m, type) and issubclass(m, Record)):
+                raise ValueError(f"decimal keys must be Record models, got {m!r}")
+            m.decimal_mask(spec)
+        return
+    known = {f.name for m in MODELS for f in m._fields if isinstance(f, Num)}
+    unknown = set(decimal) - known
+    if unknown:
+        raise ValueError(f"Unknown numeric field(s) for decimal: {', '.join(sorted(unknown))}")
+
+
+def _models(model):
+    """model 及其全部嵌套模型"""
+    out = [model]
+    for f in model._fields:
+        if isinstance(f, Nested):
+            for m in _models(f.model):
+                if m not in out:
+                    out.append(m)
+    return out
+
+
+def decimal_masks(model, decimal=(), strict=True):
+    """把 Decimal 设置解析为 {模型: 位图}，覆盖 model 及其嵌套模型
+
+    decimal 可以是：
+    - True：全部数值字段
+    - 字段名序列：作用于 model 及嵌套模型中同名的数值字段；strict=True 时未知字段名抛出 ValueError，
+      strict=False 时忽略（用于同一设置共享给多个模型的场景）
+    - {模型: True 或字段名序列}：按模型分别设置，未列出的模型使用 float
+    """
+    models = _models(model)
+    if decimal is True:
+        return {m: m.decimal_mask(True) for m in models}
+    if isinstance(decimal, dict):
+        return {m: m.decimal_mask(decimal[m]) for m in models if m in decimal}
+    names = set(decimal or ())
+    masks = {}
+    found = set()
+    for m in models:
+        mask = 0
+        for f in m._fields:
+            if isinstance(f, Num) and f.name in names:
+                mask |= 1 << f.index
+                found.add(f.name)
+        if mask:
+            masks[m] = mask
+    if strict and names - found:
+        missing = ", ".join(sorted(names - found))
+        raise ValueError(f"{model.__name__} has no numeric field(s): {missing}")
+    return masks
+
+
+def _select(model, fields):
+    if fields is None:
+        return [f for f in model._fields if not isinstance(f, Nested)]
+    by_name = {f.name: f for f in model._fields}
+    selected = []
+    for name in fields:
+        f = by_name.get(name)
+        if f is None or isinstance(f, Nested):
+            raise ValueError(f"{model.__name__} has no column {name!r}")
+        selected.append(f)
+    return selected
+
+
+def _to_columns(selected, rows):
+    """rows 为按 selected 顺序排列的原始值元组"""
+    nan = float("nan")
+    columns = {}
+    raw_columns = list(zip(*rows)) if rows else [()] * len(selected)
+    for f, raw in zip(selected, raw_columns):
+        if isinstance(f, Num):
+            columns[f.name] = array("d", [float(v) if v else nan for v in raw])
+        elif isinstance(f, Int):
+            columns[f.name] = array("q", [int(v) if v else 0 for v in raw])
+        else:
+            columns[f.name] = list(raw)
+    return columns
+
+
+def parse(resp, model, decimal=(), strict=True):
+    """把已解析的 REST 响应 dict 解码为 model 记录列表（字段惰性解码），错误时抛出 OKXAPIError
+
+    decimal: 见 decimal_masks；未指定的数值字段为 float。
+    此时 dict 已全部构造，只能降低常驻内存；直接持有响应文本时优先使用 loads()。
+    """
+    data = check(resp)
+    masks = decimal_masks(model, decimal, strict)
+    keys = model._keys
+    return [model(list(map(d.get, keys)), masks) for d in data]
+
+
+def parse_columns(resp, model, fields=None):
+    """把已解析的列表响应一次性解码为列式数组：{字段名: 列}
+
+    Num -> array('d')（缺失为 nan），Int -> array('q')（缺失为 0），Str -> list；
+    Nested 字段不参与列式解码。直接持有响应文本时优先使用 loads_columns()。
+    """
+    data = check(resp)
+    selected = _select(model, fields)
+    keys = [f.key for f in selected]
+    return _to_columns(selected, [tuple(map(d.get, keys)) for d in data])
+
+
+def loads(text, model, decimal=(), strict=True):
+    """直接从响应文本解码为 model 记录列表
+
+    通过 json object_hook 在解析过程中把每条记录（包含 model._required 全部键的对象）转换为 Record，
+    对应的 dict 随即释放，峰值内存约为 json.loads + parse() 的一半，但解析更慢（见上方性能说明），
+    只适合 positions/fills 等大批量列表；单条响应用 json.loads + parse() 即可。
+    """
+    masks = decimal_masks(model, decimal, strict)
+    keys = model._keys
+    required = model._required
+
+    def hook(d):
+        if required <= d.keys():
+            return model(list(map(d.get, keys)), masks)
+        return d
+
+    data = check(json.loads(text, object_hook=hook))
+    # 缺少部分字段而未在解析时匹配的记录，在此补充转换
+    return [d if isinstance(d, model) else model.from_dict(d, masks) for d in data]
+
+
+def loads_columns(text, model, fields=None):
+    """直接从响应文本解码为列式数组（格式同 parse_columns）
+
+    解析过程中每条记录只保留所选字段的原始值元组，dict 随即释放，最终转换为 array。
+    JSON 数组总是解码为 list，因此顶层 data 中的 tuple 一定是已匹配的记录，行与 data 一一对应。
+    """
+    selected = _select(model, fields)
+    keys = [f.key for f in selected]
+    required = model._required
+
+    def hook(d):
+        if required <= d.keys():
+            return tuple(map(d.get, keys))
+        return d
+
+    data = check(json.loads(text, object_hook=hook))
+    rows = [d if isinstance(d, tuple) else tuple(map(d.get, keys)) for d in data]
+    return _to_columns(selected, rows)